@@ -7,20 +7,23 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
-import os, django
+import os
+
+from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'connect_four_project.settings')
-django.setup()
+# Sets Django up, so it has to run before anything importing models
+django_application = get_asgi_application()
 
-from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
+# Game consumers only need the session, so the authentication middleware (and its backends) is not loaded
+from channels.sessions import SessionMiddlewareStack
 from game_app import routing as game_routing
 
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "http": django_application,
+    "websocket": SessionMiddlewareStack(
         URLRouter(
             game_routing.websocket_urlpatterns
         )
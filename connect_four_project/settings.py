@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -79,10 +80,42 @@ ASGI_APPLICATION = 'connect_four_project.asgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # CONNECT_FOUR_DB_PATH points the server (or a benchmark) at another database file
+        'NAME': os.environ.get('CONNECT_FOUR_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Production SQLite mode, enabled with CONNECT_FOUR_SQLITE_PRODUCTION=1. Connections are kept open across requests
+# (each RoomDatabaseExecutor worker thread, see GAME_DB_WORKERS, reuses its own) and game_app applies SQLITE_PRAGMAS
+# to every new connection.
+SQLITE_PRODUCTION = os.environ.get('CONNECT_FOUR_SQLITE_PRODUCTION') == '1'
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS if SQLITE_PRODUCTION else {}
+
+if SQLITE_PRODUCTION:
+    DATABASES['default']['CONN_MAX_AGE'] = None
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Threads running game database work. Operations of one room always run on the same thread, in order.
+GAME_DB_WORKERS = int(os.environ.get('CONNECT_FOUR_DB_WORKERS', 4))
+
+# Opening book generated with `python manage.py build_opening_book`. Missing books are ignored.
+OPENING_BOOK_PATH = BASE_DIR / 'opening_book.bin'
+
+# Move hints: search processes, deepest search (on the standard board, shallower on boards with more rows), seconds a
+# hint request may search for and number of positions whose results are cached per server process.
+HINT_WORKERS = int(os.environ.get('CONNECT_FOUR_HINT_WORKERS', 2))
+HINT_MAX_DEPTH = 8
+HINT_TIME_BUDGET = 10
+HINT_CACHE_SIZE = 10000
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels.layers.InMemoryChannelLayer"
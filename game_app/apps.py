@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class GameAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game_app'
+
+    def ready(self):
+        from game_app.sqlite import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid='game_app.sqlite.configure_connection')
@@ -6,13 +6,29 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from enum import IntEnum
+import asyncio
+from urllib.parse import parse_qs
 import json
-from .models import Game, GameState, PlayerCharacter
-from game_app.exceptions import IllegalMoveException
+from .db_executor import room_database_sync_to_async
+from .models import Game, GameState, PlayerCharacter, ROW_COUNT, COLUMN_COUNT, WIN_COUNT
+from game_app.exceptions import IllegalMoveException, InvalidBoardGeometry
 
 
 class WebsocketErrorCodes(IntEnum):
     unable_to_join = 4000
+    invalid_geometry = 4001
+
+
+def parse_move(move):
+    """
+    Split a move such as '3L' or '12R' into its row and side.
+    :param move: Row number followed by the side character.
+    :return: Tuple with row and side.
+    """
+    try:
+        return int(move[:-1]), move[-1]
+    except (TypeError, ValueError, IndexError):
+        raise IllegalMoveException('Invalid move')
 
 
 class GameConsumer(AsyncWebsocketConsumer):
@@ -20,11 +36,14 @@ class GameConsumer(AsyncWebsocketConsumer):
     Game controller. Consumers incoming player connections, coordinates player moves and broadcasts game state and errors.
     """
     game = None
+    game_defaults = {}
     game_group_name = None
     game_id = None
     player_id = None
     player_count = None
     player_character = None
+    hint_task = None
+    hint_move_count = None
 
     async def connect(self):
         """
@@ -33,6 +52,14 @@ class GameConsumer(AsyncWebsocketConsumer):
         self.game_id = self.scope['url_route']['kwargs']['game_id']
         self.game_group_name = f'game_{self.game_id}'
 
+        # Board geometry requested in the query string only applies if this connection creates the room
+        try:
+            self.game_defaults = Game.creation_defaults(*self._requested_geometry())
+        except (InvalidBoardGeometry, ValueError):
+            await self.accept()
+            await self.close(code=int(WebsocketErrorCodes.invalid_geometry))
+            return
+
         # Ensure that the current session has a session ID
         if not self.scope['session'].session_key:
             await database_sync_to_async(self.scope['session'].save)()
@@ -58,23 +85,28 @@ class GameConsumer(AsyncWebsocketConsumer):
         :param close_code: Code representing disconnect reason.
         :return:
         """
+        self._cancel_hint()
         await self.channel_layer.group_discard(
             self.game_group_name,
             self.channel_name
         )
-        if close_code != int(WebsocketErrorCodes.unable_to_join):
+        if close_code not in (WebsocketErrorCodes.unable_to_join, WebsocketErrorCodes.invalid_geometry):
             await self._drop_from_game()
             await self.channel_layer.group_send(self.game_group_name, {'type': 'send_state'})
 
     async def receive(self, text_data):
         """
-        Processes move requests from players, and broadcast game state changes back to players.
-        :param text_data: Player move, JSON-encoded.
+        Processes move and hint requests from players, and broadcast game state changes back to players.
+        :param text_data: Player move (e.g. {"move": "3L"}) or hint request ({"type": "hint"}), JSON-encoded.
         """
         try:
             text_data_json = json.loads(text_data)
+            if text_data_json.get('type') == 'hint':
+                await self._start_hint()
+                return
+
             move = text_data_json['move']
-            row, side = int(move[0]), move[1]
+            row, side = parse_move(move)
 
             await self._refresh_game()
 
@@ -97,6 +129,9 @@ class GameConsumer(AsyncWebsocketConsumer):
         Send latest game state.
         """
         await self._refresh_game()
+        if self.hint_move_count != self.game.board_move_counter:
+            # Position changed, the hint being computed is no longer useful
+            self._cancel_hint()
         await self.send(json.dumps({
             'type': 'game_state',
             'state': self.game.state,
@@ -106,11 +141,56 @@ class GameConsumer(AsyncWebsocketConsumer):
             'turn_room_id': self.game.get_current_turn()
         }))
 
-    @database_sync_to_async
+    async def _start_hint(self):
+        """
+        Starts streaming hints for the current position to this player, replacing a hint in progress for an older
+        position.
+        """
+        await self._refresh_game()
+
+        if not(self.game.state == GameState.started):
+            raise IllegalMoveException('Game has not yet begun.')
+
+        if not(self.game.get_current_turn() == self.player_count):
+            raise IllegalMoveException('Hints are only available on your turn.')
+
+        if self.hint_task is not None and not self.hint_task.done() \
+                and self.hint_move_count == self.game.board_move_counter:
+            # Still searching this position, its deeper hints keep coming without starting over
+            return
+
+        self._cancel_hint()
+        self.hint_move_count = self.game.board_move_counter
+        self.hint_task = asyncio.create_task(self._stream_hint(self.game.get_board()))
+
+    async def _stream_hint(self, board):
+        # Search modules are loaded on the first hint, so they do not slow down worker startup
+        from .hints import stream_hints
+        try:
+            async for result in stream_hints(board):
+                await self.send(json.dumps({
+                    'type': 'hint',
+                    'move_count': board.move_count,
+                    'row': result.row,
+                    'side': result.side,
+                    'score': result.score,
+                    'depth': result.depth
+                }))
+        except Exception as e:
+            # Nothing awaits this task, so failures (e.g. a broken search pool) are reported to the player here
+            await self._send_error(f'Unable to compute a hint: {e}')
+
+    def _cancel_hint(self):
+        if self.hint_task is not None:
+            self.hint_task.cancel()
+            self.hint_task = None
+        self.hint_move_count = None
+
+    @room_database_sync_to_async
     def _refresh_game(self):
-        self.game, _ = Game.objects.get_or_create(pk=self.game_id)
+        self.game, _ = Game.objects.get_or_create(pk=self.game_id, defaults=self.game_defaults)
 
-    @database_sync_to_async
+    @room_database_sync_to_async
     def _join_game(self):
         if self.game.state != GameState.waiting_room:
             return False
@@ -122,7 +202,7 @@ class GameConsumer(AsyncWebsocketConsumer):
         self.game.save()
         return True
 
-    @database_sync_to_async
+    @room_database_sync_to_async
     def _drop_from_game(self):
         self.game.drop_from_game(self.player_id)
         if self.game.is_game_empty():
@@ -131,10 +211,20 @@ class GameConsumer(AsyncWebsocketConsumer):
         else:
             self.game.save()
 
-    @database_sync_to_async
+    @room_database_sync_to_async
     def _save_game(self):
         self.game.save()
 
+    def _requested_geometry(self):
+        """
+        :return: (rows, columns, win_count) requested in the connection query string (e.g. ?rows=9&columns=9&win=5),
+            falling back to the standard geometry.
+        """
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        return (int(query.get('rows', [ROW_COUNT])[0]),
+                int(query.get('columns', [COLUMN_COUNT])[0]),
+                int(query.get('win', [WIN_COUNT])[0]))
+
     async def _send_error(self, message):
         await self.send(text_data=json.dumps({
             'type': 'error',
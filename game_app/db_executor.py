@@ -0,0 +1,125 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class RoomDatabaseExecutor:
+    """
+    Pool of single-threaded database workers. Work is routed by room, so all operations of one room run in order on
+    the same worker while different rooms run in parallel, and a slow query only delays the rooms sharing its worker.
+    """
+    def __init__(self, workers):
+        """
+        :param workers: Number of database worker threads.
+        """
+        if workers < 1:
+            raise ValueError('At least one database worker is required.')
+        self.workers = workers
+        self._executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'game-db-{i}') for i in range(workers)
+        ]
+        self._lock = threading.Lock()
+        self._stats = [{'queue_depth': 0, 'completed': 0, 'total_wait': 0.0, 'max_wait': 0.0} for _ in range(workers)]
+
+    def worker_for(self, room):
+        """
+        :param room: Room identifier, usually the game id.
+        :return: Index of the worker that runs every operation of the given room.
+        """
+        try:
+            return int(room) % self.workers
+        except (TypeError, ValueError):
+            return hash(room) % self.workers
+
+    def submit(self, room, fn, *args, **kwargs):
+        """
+        Schedules fn on the worker that owns the room.
+        :return: concurrent.futures.Future with the result of fn.
+        """
+        worker = self.worker_for(room)
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self._stats[worker]['queue_depth'] += 1
+        return self._executors[worker].submit(self._call, worker, enqueued_at, fn, *args, **kwargs)
+
+    async def run(self, room, fn, *args, **kwargs):
+        """
+        Runs fn on the worker that owns the room and waits for its result without blocking the event loop.
+        """
+        context = contextvars.copy_context()
+        future = self.submit(room, context.run, fn, *args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        """
+        :return: Queue depth and wait times (time from submission until a worker picks the call up, in seconds),
+            both in total and per worker.
+        """
+        with self._lock:
+            per_worker = []
+            for s in self._stats:
+                per_worker.append({
+                    'queue_depth': s['queue_depth'],
+                    'completed': s['completed'],
+                    'mean_wait': s['total_wait'] / s['completed'] if s['completed'] else 0.0,
+                    'max_wait': s['max_wait'],
+                })
+        return {
+            'workers': self.workers,
+            'queue_depth': sum(s['queue_depth'] for s in per_worker),
+            'completed': sum(s['completed'] for s in per_worker),
+            'max_wait': max(s['max_wait'] for s in per_worker),
+            'per_worker': per_worker,
+        }
+
+    def shutdown(self, wait=True):
+        for executor in self._executors:
+            executor.shutdown(wait=wait)
+
+    def _call(self, worker, enqueued_at, fn, *args, **kwargs):
+        wait = time.perf_counter() - enqueued_at
+        with self._lock:
+            s = self._stats[worker]
+            s['queue_depth'] -= 1
+            s['completed'] += 1
+            s['total_wait'] += wait
+            s['max_wait'] = max(s['max_wait'], wait)
+        # Same connection housekeeping database_sync_to_async does around each call.
+        close_old_connections()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    :return: Process-wide RoomDatabaseExecutor, sized by settings.GAME_DB_WORKERS.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = RoomDatabaseExecutor(getattr(settings, 'GAME_DB_WORKERS', 4))
+    return _executor
+
+
+def room_database_sync_to_async(method):
+    """
+    Consumer method decorator. Counterpart of database_sync_to_async that runs the method on the database worker
+    owning the consumer's game_id.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await get_executor().run(self.game_id, method, self, *args, **kwargs)
+    return wrapper
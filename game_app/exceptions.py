@@ -4,3 +4,11 @@ class IllegalMoveException(Exception):
 
 class UnknownPlayer(Exception):
     pass
+
+
+class InvalidBoardGeometry(Exception):
+    pass
+
+
+class SearchAborted(Exception):
+    pass
@@ -0,0 +1,139 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+from game_app.exceptions import SearchAborted
+from game_app.models import Board, ROW_COUNT, transform_move
+from game_app.opening_book import get_opening_book
+from game_app.search import WIN_SCORE, SearchResult, search
+
+_pool = None
+_manager = None
+_pool_lock = threading.Lock()
+# Deepest result found for each canonical position, with its move in the canonical orientation. Most recently used
+# last. Only touched from the event loop.
+_cache = OrderedDict()
+
+
+def get_pool():
+    """
+    :return: Process pool running hint searches, sized by settings.HINT_WORKERS. Workers are spawned rather than
+        forked, since the server process already runs database threads.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=getattr(settings, 'HINT_WORKERS', 2),
+                                            mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=django.setup)
+    return _pool
+
+
+def max_hint_depth(board):
+    """
+    :return: Deepest hint search for the geometry of board. Every row adds two moves to each ply, so
+        settings.HINT_MAX_DEPTH, meant for the standard board, shrinks in proportion to the number of rows.
+    """
+    max_depth = getattr(settings, 'HINT_MAX_DEPTH', 8)
+    return min(max_depth, max(2, max_depth * ROW_COUNT // board.rows))
+
+
+def _cancel_event(executor):
+    """
+    :return: Event cancelling the searches of one hint stream. Searches of the shared pool run in other processes, so
+        they watch an event held by a manager process.
+    """
+    global _manager
+    if executor is not None:
+        return threading.Event()
+    if _manager is None:
+        with _pool_lock:
+            if _manager is None:
+                _manager = multiprocessing.get_context('spawn').Manager()
+    return _manager.Event()
+
+
+def _search(board_json, depth, deadline, cancel):
+    try:
+        return tuple(search(Board.from_json(board_json), depth, deadline=deadline, cancel=cancel))
+    except SearchAborted:
+        return None
+
+
+def _orient(board, result, symmetry):
+    row, side = transform_move(board.rows, result.row, result.side, symmetry)
+    return result._replace(row=row, side=side)
+
+
+def _remember(key, result):
+    _cache[key] = result
+    _cache.move_to_end(key)
+    while len(_cache) > getattr(settings, 'HINT_CACHE_SIZE', 10000):
+        _cache.popitem(last=False)
+
+
+async def stream_hints(board, max_depth=None, executor=None, time_budget=None):
+    """
+    Anytime search for the player to move: yields results of increasing depth as they are found. Book positions and
+    positions already searched are answered right away from the opening book and the hint cache. A search still
+    running is abandoned as soon as the consumer of this generator is cancelled or closes it, and in any case once the
+    time budget runs out.
+    :param board: Board to analyse. It is not modified.
+    :param max_depth: Deepest search to run. Defaults to max_hint_depth(board).
+    :param executor: Executor running the searches. Defaults to the shared process pool. Other executors must run
+        them in this process.
+    :param time_budget: Seconds, from this call, after which no deeper result is computed. Defaults to
+        settings.HINT_TIME_BUDGET.
+    :return: Async generator of SearchResult.
+    """
+    if board.find_winner() is not None or not board.legal_moves():
+        return
+    max_depth = max_depth or max_hint_depth(board)
+    deadline = time.time() + (time_budget or getattr(settings, 'HINT_TIME_BUDGET', 10))
+
+    depth = 1
+    book = get_opening_book()
+    entry = book.lookup(board) if book is not None else None
+    if entry is not None:
+        # Book entries come from fixed-depth searches, so deeper searches still run after answering with one
+        yield SearchResult(entry.score, entry.row, entry.side, book.search_depth)
+        if book.search_depth >= max_depth or abs(entry.score) > WIN_SCORE:
+            return
+        depth = book.search_depth + 1
+
+    canonical_hash, symmetry = board.canonical()
+    key = board.rows, board.columns, board.win_count, canonical_hash
+    cached = _cache.get(key)
+    if cached is not None and cached.depth >= depth:
+        _cache.move_to_end(key)
+        yield _orient(board, cached, symmetry)
+        if cached.depth >= max_depth or abs(cached.score) > WIN_SCORE:
+            return
+        depth = cached.depth + 1
+
+    loop = asyncio.get_running_loop()
+    board_json = str(board)
+    # Starting the manager process must not block the event loop
+    cancel = await loop.run_in_executor(None, _cancel_event, executor)
+    try:
+        for depth in range(depth, max_depth + 1):
+            result = await loop.run_in_executor(executor or get_pool(), _search, board_json, depth, deadline, cancel)
+            if result is None:
+                # Out of time or cancelled, the previous depth is the final answer
+                return
+            result = SearchResult(*result)
+            _remember(key, _orient(board, result, symmetry))
+            yield result
+            if abs(result.score) > WIN_SCORE:
+                # Forced result, deeper searches cannot change it
+                return
+    finally:
+        # Frees the worker of a search still running, e.g. when the position changed and the hint task was cancelled
+        cancel.set()
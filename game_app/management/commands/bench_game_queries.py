@@ -0,0 +1,108 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from game_app.models import Board, Game, GameState, ROW_COUNT, COLUMN_COUNT, WIN_COUNT
+
+
+class Command(BaseCommand):
+    """
+    Measures the cost of the operational game queries on a large synthetic table, with and without the indexes
+    declared in Game.Meta. All rows are inserted inside a transaction that is rolled back at the end, so the
+    configured database is left untouched.
+    """
+    help = 'Benchmark operational Game queries on a large synthetic table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000, help='Number of synthetic games to insert.')
+        parser.add_argument('--repeat', type=int, default=5, help='Times each query runs; best time is reported.')
+        parser.add_argument('--batch-size', type=int, default=50_000, help='Rows inserted per statement batch.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed used to generate synthetic games.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._populate(options['rows'], options['batch_size'], random.Random(options['seed']))
+            player = 'session-%d' % (options['rows'] // 2)
+            queries = [
+                ('waiting_rooms', lambda: Game.objects.waiting_rooms()[:50]),
+                ('stale', lambda: Game.objects.stale(timedelta(hours=1)).only('id')[:1000]),
+                ('for_player', lambda: Game.objects.for_player(player)),
+            ]
+
+            self.stdout.write('Indexed:')
+            self._run(queries, options['repeat'], 'indexed')
+
+            with connection.cursor() as cursor:
+                for index in Game._meta.indexes:
+                    cursor.execute('DROP INDEX %s' % connection.ops.quote_name(index.name))
+            self.stdout.write('Without indexes:')
+            self._run(queries, options['repeat'], 'unindexed')
+
+            transaction.set_rollback(True)
+
+    def _populate(self, rows, batch_size, rng):
+        table = Game._meta.db_table
+        columns = ['player1', 'player2', 'board', 'board_move_counter', 'winner', 'state', 'updated_at',
+                   'finished_at', 'rows', 'columns', 'win_count']
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            connection.ops.quote_name(table),
+            ', '.join(connection.ops.quote_name(c) for c in columns),
+            ', '.join(['%s'] * len(columns)),
+        )
+        board = str(Board.clear_board())
+        now = timezone.now()
+        states = [GameState.waiting_room, GameState.started, GameState.winner_found, GameState.draw]
+        weights = [1, 2, 60, 5]
+
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            for offset in range(0, rows, batch_size):
+                batch = []
+                for i in range(offset, min(offset + batch_size, rows)):
+                    state = rng.choices(states, weights)[0]
+                    updated_at = connection.ops.adapt_datetimefield_value(
+                        now - timedelta(seconds=rng.randrange(30 * 24 * 3600)))
+                    finished = state in (GameState.winner_found, GameState.draw)
+                    batch.append((
+                        'session-%d' % i,
+                        None if state == GameState.waiting_room else 'session-%d' % (rows + i),
+                        board,
+                        0,
+                        rng.choice([1, 2]) if state == GameState.winner_found else None,
+                        state.value,
+                        updated_at,
+                        updated_at if finished else None,
+                        ROW_COUNT,
+                        COLUMN_COUNT,
+                        WIN_COUNT,
+                    ))
+                cursor.executemany(sql, batch)
+        self.stdout.write('Inserted %d games in %.1fs' % (rows, time.perf_counter() - start))
+
+    def _run(self, queries, repeat, label):
+        for name, build in queries:
+            best = None
+            count = 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                count = len(list(build()))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write('  %-14s %9.3f ms  (%d rows)' % (name, best * 1000, count))
+            self._explain(build(), label)
+
+    def _explain(self, queryset, label):
+        """
+        Writes the query plan of queryset. The sqlite3 module reuses prepared statements with the same text, and a
+        reused EXPLAIN keeps the plan it was prepared with even after DROP INDEX, so the label makes each pass prepare
+        its own statement.
+        """
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN %s -- %s' % (sql, label), params)
+            for row in cursor.fetchall():
+                self.stdout.write('      ' + ' '.join(str(c) for c in row))
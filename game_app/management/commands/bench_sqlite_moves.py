@@ -0,0 +1,94 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from game_app.consumers import GameConsumer
+from game_app.models import Board, BoardSide, Game, PlayerCharacter
+
+
+class Command(BaseCommand):
+    """
+    Compares move throughput of the default SQLite configuration against the production mode enabled with
+    CONNECT_FOUR_SQLITE_PRODUCTION=1. Each configuration is measured in its own process, which loads the settings
+    module with the mode switched on or off and a temporary database. Moves go through the same ORM calls GameConsumer
+    makes on the room database workers: a refresh, the save and one refresh per player when the new state is
+    broadcast.
+    """
+    help = 'Benchmark move throughput with the default and production SQLite settings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--moves', type=int, default=5000, help='Total number of moves to play.')
+        parser.add_argument('--rooms', type=int, default=32, help='Number of concurrent game rooms.')
+        parser.add_argument('--threads', type=int, default=4, help='Database worker threads (GAME_DB_WORKERS).')
+        parser.add_argument('--measure', action='store_true',
+                            help='Measure the configuration of this process only. Writes to the configured database.')
+
+    def handle(self, *args, **options):
+        if options['measure']:
+            elapsed = self._measure(options['moves'], options['rooms'])
+            self.stdout.write('%.1f' % (options['moves'] / elapsed))
+            return
+
+        results = {}
+        for name, production in (('default', '0'), ('production', '1')):
+            with tempfile.TemporaryDirectory() as directory:
+                env = dict(os.environ,
+                           CONNECT_FOUR_SQLITE_PRODUCTION=production,
+                           CONNECT_FOUR_DB_PATH=os.path.join(directory, 'bench.sqlite3'),
+                           CONNECT_FOUR_DB_WORKERS=str(options['threads']))
+                process = subprocess.run(
+                    [sys.executable, '-m', 'django', 'bench_sqlite_moves', '--measure',
+                     '--moves', str(options['moves']), '--rooms', str(options['rooms'])],
+                    cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+            if process.returncode != 0:
+                raise CommandError(f'{name} run failed:\n{process.stderr}')
+            results[name] = float(process.stdout.split()[-1])
+            self.stdout.write('%-10s %10.0f moves/sec' % (name, results[name]))
+        self.stdout.write('speedup    %10.2fx' % (results['production'] / results['default']))
+
+    def _measure(self, moves, rooms):
+        """
+        Plays moves spread over concurrent rooms on the configured database.
+        :return: Elapsed seconds.
+        """
+        call_command('migrate', verbosity=0)
+        consumers = []
+        for room in range(rooms):
+            consumer = GameConsumer()
+            consumer.game_id = room + 1
+            consumer.game_defaults = Game.creation_defaults()
+            consumers.append(consumer)
+
+        async def play(consumer, count):
+            for i in range(count):
+                await consumer._refresh_game()
+                board = consumer.game.get_board()
+                if board.is_it_full():
+                    board = Board.clear_board()
+                char = PlayerCharacter.player1 if board.move_count % 2 == 0 else PlayerCharacter.player2
+                row = next(r for r in range(board.rows) if '_' in board.board[r])
+                board.move(row, BoardSide.left if i % 2 == 0 else BoardSide.right, char)
+                consumer.game.update_board(board)
+                await consumer._save_game()
+                for _ in range(2):
+                    await consumer._refresh_game()
+
+        async def play_all(counts):
+            await asyncio.gather(*(play(consumer, count) for consumer, count in zip(consumers, counts)))
+
+        async def create_all():
+            await asyncio.gather(*(consumer._refresh_game() for consumer in consumers))
+
+        # Rooms are created before timing starts
+        asyncio.run(create_all())
+        per_room = [moves // rooms + (1 if room < moves % rooms else 0) for room in range(rooms)]
+        start = time.perf_counter()
+        asyncio.run(play_all(per_room))
+        return time.perf_counter() - start
@@ -0,0 +1,55 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Measures how long a fresh interpreter takes to load the ASGI application, which is the time a new daphne worker
+    needs before it can accept sockets.
+    """
+    help = 'Benchmark cold start of the ASGI application.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreters to start.')
+        parser.add_argument('--module', default=settings.ASGI_APPLICATION.rsplit('.', 1)[0],
+                            help='Module to import. Defaults to the module of settings.ASGI_APPLICATION.')
+        parser.add_argument('--slowest', type=int, default=0,
+                            help='Also list the given number of slowest imports, as reported by -X importtime.')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE))
+        command = [sys.executable, '-c', f'import {options["module"]}']
+
+        subprocess.run(command, cwd=settings.BASE_DIR, env=env, check=True)  # warm the file system cache
+        timings = []
+        for _ in range(options['runs']):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=settings.BASE_DIR, env=env, check=True)
+            timings.append((time.perf_counter() - start) * 1000)
+        baseline = []
+        for _ in range(options['runs']):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+            baseline.append((time.perf_counter() - start) * 1000)
+
+        self.stdout.write(f'{options["module"]}: min {min(timings):.1f} ms, median {statistics.median(timings):.1f} ms, '
+                          f'max {max(timings):.1f} ms over {options["runs"]} runs')
+        self.stdout.write(f'bare interpreter: median {statistics.median(baseline):.1f} ms')
+
+        if options['slowest']:
+            result = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], cwd=settings.BASE_DIR,
+                                    env=env, check=True, capture_output=True, text=True)
+            imports = []
+            for line in result.stderr.splitlines():
+                if not line.startswith('import time:') or 'cumulative' in line:
+                    continue
+                _, cumulative, name = line[len('import time:'):].split('|')
+                imports.append((int(cumulative), name.strip()))
+            for cumulative, name in sorted(imports, reverse=True)[:options['slowest']]:
+                self.stdout.write(f'  {cumulative / 1000:8.1f} ms  {name}')
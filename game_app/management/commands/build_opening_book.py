@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game_app.exceptions import InvalidBoardGeometry
+from game_app.models import Board, ROW_COUNT, COLUMN_COUNT, WIN_COUNT, transform_move, validate_geometry
+from game_app.opening_book import BookEntry, write_opening_book
+from game_app.search import search, side_to_move
+
+
+def _solve(args):
+    board_json, search_depth = args
+    board = Board.from_json(board_json)
+    result = search(board, search_depth)
+    key, symmetry = board.canonical()
+    row, side = transform_move(board.rows, result.row, result.side, symmetry)
+    return key, BookEntry(result.score, row, side)
+
+
+class Command(BaseCommand):
+    """
+    Precomputes the best move of every position reachable within the first --depth moves and stores them in an
+    opening book file, which game_app.opening_book memory-maps for lookups. Positions are not solved: moves and scores
+    come from a --search-depth search, and scores are heuristic unless they report a forced win or loss.
+    """
+    help = 'Generate the opening book used by move search.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=4, help='Number of opening moves covered by the book.')
+        parser.add_argument('--search-depth', type=int, default=5, help='Search depth used to evaluate positions. Scores are heuristic beyond it.')
+        parser.add_argument('--rows', type=int, default=ROW_COUNT)
+        parser.add_argument('--columns', type=int, default=COLUMN_COUNT)
+        parser.add_argument('--win', type=int, default=WIN_COUNT)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of search processes.')
+        parser.add_argument('--output', default=getattr(settings, 'OPENING_BOOK_PATH', None),
+                            help='Destination file. Defaults to settings.OPENING_BOOK_PATH.')
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError('No --output given and settings.OPENING_BOOK_PATH is not set.')
+        try:
+            validate_geometry(options['rows'], options['columns'], options['win'])
+        except InvalidBoardGeometry as e:
+            raise CommandError(str(e))
+        if options['search_depth'] < 1:
+            raise CommandError('--search-depth must be at least 1.')
+
+        start = time.perf_counter()
+        positions = self._positions(Board.clear_board(options['rows'], options['columns'], options['win']),
+                                    options['depth'])
+        self.stdout.write(f'{len(positions)} positions within {options["depth"]} moves')
+
+        work = [(board_json, options['search_depth']) for board_json in positions]
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            entries = dict(executor.map(_solve, work, chunksize=64))
+
+        write_opening_book(options['output'], options['rows'], options['columns'], options['win'],
+                           options['search_depth'], entries)
+        self.stdout.write(f'Wrote {len(entries)} entries to {options["output"]} in {time.perf_counter() - start:.1f}s')
+
+    def _positions(self, board, depth):
+        """
+        :return: JSON of every position, still undecided, that can be reached within depth moves. Only one of each set
+            of symmetric positions is kept.
+        """
+        positions = {}
+        frontier = {board.canonical_hash(): board}
+        for ply in range(depth + 1):
+            next_frontier = {}
+            for key, b in frontier.items():
+                if b.find_winner() is not None or not b.legal_moves():
+                    continue
+                positions[key] = str(b)
+                if ply == depth:
+                    continue
+                char = side_to_move(b)
+                for row, side in b.legal_moves():
+                    child = Board.from_json(str(b))
+                    child.move(row, side, char)
+                    next_frontier.setdefault(child.canonical_hash(), child)
+            frontier = next_frontier
+        return list(positions.values())
@@ -0,0 +1,89 @@
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game_app.exceptions import IllegalMoveException, InvalidBoardGeometry
+from game_app.models import ROW_COUNT, COLUMN_COUNT, WIN_COUNT, validate_geometry
+from game_app.selfplay import make_policy, play_games, replay_game
+
+
+class Command(BaseCommand):
+    """
+    Headless self-play between two policies, parallelized across processes. Game records are streamed to a JSONL file
+    and throughput is reported in games and moves per second, which makes it an end to end benchmark of the board
+    engine. With --verify, a previously generated file is replayed instead, as a regression corpus for the move and
+    winner rules.
+    """
+    help = 'Play games between policies (random, greedy, search-N), or verify a recorded corpus.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=1000, help='Number of games to play.')
+        parser.add_argument('--player1', default='random', help='Policy of the starting player.')
+        parser.add_argument('--player2', default='random', help='Policy of the other player.')
+        parser.add_argument('--rows', type=int, default=ROW_COUNT)
+        parser.add_argument('--columns', type=int, default=COLUMN_COUNT)
+        parser.add_argument('--win', type=int, default=WIN_COUNT)
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the first game; game i uses seed + i.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of processes.')
+        parser.add_argument('--batch-size', type=int, default=100, help='Games played per task.')
+        parser.add_argument('--output', help='JSONL file receiving one record per game. Records are discarded if '
+                                             'not given.')
+        parser.add_argument('--verify', metavar='FILE', help='Replay the records of a JSONL file instead of playing.')
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            return self._verify(options['verify'])
+
+        try:
+            validate_geometry(options['rows'], options['columns'], options['win'])
+            make_policy(options['player1'])
+            make_policy(options['player2'])
+        except (InvalidBoardGeometry, ValueError) as e:
+            raise CommandError(str(e))
+
+        seeds = range(options['seed'], options['seed'] + options['games'])
+        batches = [(options['player1'], options['player2'], seeds[i:i + options['batch_size']],
+                    options['rows'], options['columns'], options['win'])
+                   for i in range(0, len(seeds), options['batch_size'])]
+
+        winners = Counter()
+        moves = 0
+        output = open(options['output'], 'w') if options['output'] else None
+        start = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                for records in executor.map(play_games, batches):
+                    for record in records:
+                        winners[record['winner']] += 1
+                        moves += record['length']
+                        if output is not None:
+                            output.write(json.dumps(record, separators=(',', ':')) + '\n')
+        finally:
+            if output is not None:
+                output.close()
+        elapsed = time.perf_counter() - start
+
+        games = options['games']
+        self.stdout.write(f'{games} games, {moves} moves in {elapsed:.2f}s: {games / elapsed:.1f} games/sec, '
+                          f'{moves / elapsed:.0f} moves/sec, {moves / max(games, 1):.1f} moves/game')
+        self.stdout.write(f'player1 ({options["player1"]}) won {winners["O"]}, player2 ({options["player2"]}) won '
+                          f'{winners["X"]}, draws {winners[None]}')
+
+    def _verify(self, path):
+        checked = 0
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    replay_game(json.loads(line))
+                except (IllegalMoveException, ValueError) as e:
+                    raise CommandError(f'{path}:{line_number}: {e}')
+                except KeyError as e:
+                    raise CommandError(f'{path}:{line_number}: missing field {e}')
+                checked += 1
+        self.stdout.write(f'{checked} games replayed, all consistent with the current engine')
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_app', '0001_squashed_0006_alter_game_board'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['state', 'updated_at'], name='game_state_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player1'], name='game_player1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player2'], name='game_player2_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_app', '0007_game_activity_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='columns',
+            field=models.PositiveSmallIntegerField(default=7),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='rows',
+            field=models.PositiveSmallIntegerField(default=7),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='win_count',
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+        migrations.AlterField(
+            model_name='game',
+            name='board',
+            field=models.TextField(default='{\n  "rows": 7,\n  "columns": 7,\n  "max_moves": 49,\n  "win_count": 4,\n  "board": [\n    [\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_"\n    ],\n    [\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_"\n    ],\n    [\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_"\n    ],\n    [\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_"\n    ],\n    [\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_"\n    ],\n    [\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_"\n    ],\n    [\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_",\n      "_"\n    ]\n  ],\n  "move_count": 0\n}'),
+        ),
+    ]
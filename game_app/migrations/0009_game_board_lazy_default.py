@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:14
+
+import game_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_app', '0008_game_geometry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='game',
+            name='board',
+            field=models.TextField(default=game_app.models.clear_board_json),
+        ),
+    ]
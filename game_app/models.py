@@ -1,11 +1,86 @@
 from django.db import models
+from django.utils import timezone
+from functools import lru_cache
 import json
-from game_app.exceptions import IllegalMoveException
+import random
+from game_app.exceptions import IllegalMoveException, InvalidBoardGeometry
 from enum import Enum
 
 ROW_COUNT = 7
 COLUMN_COUNT = 7
 WIN_COUNT = 4
+MAX_DIMENSION = 32
+# Seed of the position hash keys. Changing it invalidates every stored position hash (e.g. opening books).
+POSITION_HASH_SEED = 0x0C4F0C4F
+
+
+def validate_geometry(rows, columns, win_count):
+    """
+    Checks that a board geometry can be played. Throw exception if it is invalid.
+    :param rows: Number of rows in the board.
+    :param columns: Number of columns of the board.
+    :param win_count: Number of aligned characters needed to win.
+    """
+    if not (1 <= rows <= MAX_DIMENSION and 1 <= columns <= MAX_DIMENSION):
+        raise InvalidBoardGeometry(f'Rows and columns must be between 1 and {MAX_DIMENSION}.')
+    if not (2 <= win_count <= max(rows, columns)):
+        raise InvalidBoardGeometry('Win length must be at least 2 and fit in the board.')
+
+
+@lru_cache(maxsize=None)
+def winning_segments(rows, columns, win_count):
+    """
+    Precomputed line table of a board geometry: every maximal horizontal, vertical and diagonal line of cells that
+    is long enough to hold a win, as tuples of (row, column). Computed once per (rows, columns, win_count).
+    """
+    segments = [tuple((r, c) for c in range(columns)) for r in range(rows)] if columns >= win_count else []
+    if rows >= win_count:
+        segments += [tuple((r, c) for r in range(rows)) for c in range(columns)]
+    # Diagonals (\) start on the first row or first column, (/) on the first row or last column.
+    for r0, c0, dc in ([(0, c, 1) for c in range(columns)] + [(r, 0, 1) for r in range(1, rows)] +
+                       [(0, c, -1) for c in range(columns)] + [(r, columns - 1, -1) for r in range(1, rows)]):
+        segment = []
+        r, c = r0, c0
+        while r < rows and 0 <= c < columns:
+            segment.append((r, c))
+            r, c = r + 1, c + dc
+        if len(segment) >= win_count:
+            segments.append(tuple(segment))
+    return tuple(segments)
+
+
+@lru_cache(maxsize=None)
+def winning_lines(rows, columns, win_count):
+    """
+    Every group of win_count consecutive cells on a row, column or diagonal, i.e. every way of winning on a board
+    geometry, as tuples of (row, column). Computed once per (rows, columns, win_count).
+    """
+    return tuple(segment[i:i + win_count] for segment in winning_segments(rows, columns, win_count)
+                 for i in range(len(segment) - win_count + 1))
+
+
+@lru_cache(maxsize=None)
+def cell_lines(rows, columns, win_count):
+    """
+    Cell to winning lines index: cell_lines(...)[row][column] holds the positions, in winning_lines(...), of every
+    line going through that cell.
+    """
+    index = [[[] for _ in range(columns)] for _ in range(rows)]
+    for ix, line in enumerate(winning_lines(rows, columns, win_count)):
+        for r, c in line:
+            index[r][c].append(ix)
+    return tuple(tuple(tuple(cell) for cell in row) for row in index)
+
+
+@lru_cache(maxsize=None)
+def position_hash_keys(rows, columns):
+    """
+    Random 64-bit keys used to hash positions (Zobrist hashing): position_hash_keys(...)[p][row][column] is the key
+    of a character of player p (0 for O, 1 for X) on that cell. Keys are derived from POSITION_HASH_SEED, so hashes are
+    stable across processes and restarts.
+    """
+    rng = random.Random(POSITION_HASH_SEED ^ (rows << 16) ^ columns)
+    return tuple(tuple(tuple(rng.getrandbits(64) for _ in range(columns)) for _ in range(rows)) for _ in range(2))
 
 
 class GameState(str, Enum):
@@ -25,32 +100,64 @@ class BoardSide(str, Enum):
     right = 'R'
 
 
+# Board symmetries as (mirror left and right, flip top and bottom). Characters stack along rows from either side,
+# so both reflections map legal positions to legal positions and winning lines to winning lines, whatever the board
+# shape. Transposing (and so rotating) a square board does not, since it would turn rows into columns. Each
+# symmetry is its own inverse.
+SYMMETRIES = ((False, False), (True, False), (False, True), (True, True))
+
+
+def transform_move(rows, row, side, symmetry):
+    """
+    Maps a move to the equivalent move on the board transformed by the given symmetry. Applying the same symmetry
+    again maps it back.
+    :param rows: Number of rows in the board.
+    :param symmetry: Index in SYMMETRIES.
+    :return: (row, side) of the equivalent move.
+    """
+    mirror, flip = SYMMETRIES[symmetry]
+    if mirror:
+        side = BoardSide.right if side == BoardSide.left else BoardSide.left
+    return (rows - 1 - row if flip else row), side
+
+
+def _player_index(char):
+    return 0 if char == PlayerCharacter.player1 else 1
+
+
 class Board:
     """
     Connect four two-dimensional board.
     """
-    def __init__(self, board, move_count):
+    def __init__(self, board, move_count, win_count=WIN_COUNT):
         """
         Default board constructor
         :param board: two-dimensional array representing the board (e.g. [['_', '_'], ['_', '_']])
         :param move_count: Counter of moves that have been performed by players on the input board.
+        :param win_count: Number of aligned characters needed to win.
         """
         self.rows = len(board)
         self.columns = len(board[0])
         self.max_moves = self.rows * self.columns
+        self.win_count = win_count
         self.board = board
         self.move_count = move_count
+        # Line counters and position hashes are private and built on first use, see _counters() and _hashes()
+        self._line_counts = None
+        self._open_lines = None
+        self._symmetry_hashes = None
 
     @classmethod
-    def clear_board(cls, rows=ROW_COUNT, columns=COLUMN_COUNT):
+    def clear_board(cls, rows=ROW_COUNT, columns=COLUMN_COUNT, win_count=WIN_COUNT):
         """
         Creates a brand new two-dimensional clear board.
         :param rows: Number of rows in the board
         :param columns: Number of columns of the board.
+        :param win_count: Number of aligned characters needed to win.
         :return: two-dimensional clear board.
         """
         starting_board = [["_" for _ in range(columns)] for _ in range(rows)]
-        return cls(starting_board, 0)
+        return cls(starting_board, 0, win_count)
 
     @classmethod
     def from_json(cls, json_str):
@@ -60,11 +167,12 @@ class Board:
         :return: Instance of board.
         """
         data = json.loads(json_str)
-        return cls(data['board'], data['move_count'])
+        return cls(data['board'], data['move_count'], data.get('win_count', WIN_COUNT))
 
     def __iter__(self):
         for attr, value in self.__dict__.items():
-            yield attr, value
+            if not attr.startswith('_'):
+                yield attr, value
 
     def move(self, row: int, side: str, char: PlayerCharacter):
         """
@@ -72,6 +180,7 @@ class Board:
         :param row: Row where character will be placed.
         :param side: Side where character will be placed, either left of right.
         :param char: Character to be player, either X or O.
+        :return: Column where the character was placed.
         """
         if self.move_count >= self.max_moves:
             raise IllegalMoveException('Reached the maximum number of movements.')
@@ -85,70 +194,182 @@ class Board:
         if char != PlayerCharacter.player1 and char != PlayerCharacter.player2:
             raise IllegalMoveException('Invalid player character')
 
-        try:
-            if side == BoardSide.left:
-                col = self.board[row].index('_')
-            else:
-                col = next(i for i in reversed(range(len(self.board[row]))) if self.board[row][i] == '_')
-        except (ValueError, StopIteration):
+        col = self.target_column(row, side)
+        if col is None:
             raise IllegalMoveException('Unable to place character in the specified row.')
 
         self.board[row][col] = char
         self.move_count += 1
+        if self._line_counts is not None:
+            self._update_counters(row, col, char, 1)
+        if self._symmetry_hashes is not None:
+            self._update_hashes(row, col, char)
+        return col
+
+    def undo(self, row, col):
+        """
+        Reverts the last move, which placed a character on the given cell. Used by search code to explore moves in
+        place.
+        :param row: Row of the cell returned by move().
+        :param col: Column returned by move().
+        """
+        char = self.board[row][col]
+        self.board[row][col] = '_'
+        self.move_count -= 1
+        if self._line_counts is not None:
+            self._update_counters(row, col, char, -1)
+        if self._symmetry_hashes is not None:
+            self._update_hashes(row, col, char)
+
+    def position_hash(self):
+        """
+        :return: 64-bit hash of the characters on the board. Computed on first use and then updated by every move.
+        """
+        return self._hashes()[0]
+
+    def canonical(self):
+        """
+        Canonical form of the position: the smallest hash among the board and its symmetric images (see SYMMETRIES).
+        Symmetric positions share it, so it is the key of every position-keyed store (search tables, opening book,
+        hint cache).
+        :return: (hash, symmetry). symmetry is the SYMMETRIES index mapping this board to its canonical image; moves are
+            translated between both with transform_move().
+        """
+        hashes = self._hashes()
+        symmetry = min(range(len(SYMMETRIES)), key=hashes.__getitem__)
+        return hashes[symmetry], symmetry
+
+    def canonical_hash(self):
+        """
+        :return: Hash of the canonical form of the position, see canonical().
+        """
+        return min(self._hashes())
+
+    def _hashes(self):
+        """
+        :return: Position hash of the board transformed by each of SYMMETRIES, built on first use and then updated by
+            every move.
+        """
+        if self._symmetry_hashes is None:
+            self._symmetry_hashes = [0] * len(SYMMETRIES)
+            for row, cells in enumerate(self.board):
+                for col, el in enumerate(cells):
+                    if el == PlayerCharacter.player1 or el == PlayerCharacter.player2:
+                        self._update_hashes(row, col, el)
+        return self._symmetry_hashes
+
+    def _update_hashes(self, row, col, char):
+        keys = position_hash_keys(self.rows, self.columns)[_player_index(char)]
+        mirrored_col, flipped_row = self.columns - 1 - col, self.rows - 1 - row
+        hashes = self._symmetry_hashes
+        hashes[0] ^= keys[row][col]
+        hashes[1] ^= keys[row][mirrored_col]
+        hashes[2] ^= keys[flipped_row][col]
+        hashes[3] ^= keys[flipped_row][mirrored_col]
+
+    def target_column(self, row, side):
+        """
+        :param row: Row where character would be placed.
+        :param side: Side where character would be placed, either left of right.
+        :return: Column where the character would land. None if the row is full.
+        """
+        cells = self.board[row]
+        columns = range(self.columns) if side == BoardSide.left else range(self.columns - 1, -1, -1)
+        for col in columns:
+            if cells[col] == '_':
+                return col
+        return None
+
+    def legal_moves(self):
+        """
+        :return: List of (row, side) moves that can be played. A right side move landing on the same cell as the left
+            side move of its row is left out.
+        """
+        moves = []
+        for row in range(self.rows):
+            left = self.target_column(row, BoardSide.left)
+            if left is None:
+                continue
+            moves.append((row, BoardSide.left))
+            if self.target_column(row, BoardSide.right) != left:
+                moves.append((row, BoardSide.right))
+        return moves
+
+    def has_win(self, char):
+        """
+        :return: True if the given character completed at least one winning line.
+        """
+        return self._counters()[1][_player_index(char)][self.win_count] > 0
+
+    def count_open(self, char, count):
+        """
+        :param char: Character, either X or O.
+        :param count: Number of characters in the line (e.g. 3 to count open threes in a four in a row game).
+        :return: Number of winning lines holding exactly count characters of char and none of the opponent.
+        """
+        return self._counters()[1][_player_index(char)][count]
+
+    def immediate_threats(self, char):
+        """
+        :param char: Character, either X or O.
+        :return: List of (row, side) moves that would win the game for char right away.
+        """
+        line_counts, _ = self._counters()
+        p = _player_index(char)
+        mine, theirs = line_counts[p], line_counts[1 - p]
+        index = cell_lines(self.rows, self.columns, self.win_count)
+        target = self.win_count - 1
+        threats = []
+        for row, side in self.legal_moves():
+            col = self.target_column(row, side)
+            if any(mine[ix] == target and theirs[ix] == 0 for ix in index[row][col]):
+                threats.append((row, side))
+        return threats
+
+    def _counters(self):
+        """
+        Per-line counters, built from the board on first use and then updated by every move in O(lines touched).
+        Board cells are expected to change through move() afterwards.
+        :return: (line_counts, open_lines). line_counts[p][ix] is the number of characters of player p (0 for O,
+            1 for X) in winning line ix. open_lines[p][n] is the number of lines with n characters of player p and
+            none of the opponent.
+        """
+        if self._line_counts is None:
+            line_count = len(winning_lines(self.rows, self.columns, self.win_count))
+            self._line_counts = ([0] * line_count, [0] * line_count)
+            self._open_lines = tuple([line_count] + [0] * self.win_count for _ in range(2))
+            for row, cells in enumerate(self.board):
+                for col, el in enumerate(cells):
+                    if el == PlayerCharacter.player1 or el == PlayerCharacter.player2:
+                        self._update_counters(row, col, el, 1)
+        return self._line_counts, self._open_lines
+
+    def _update_counters(self, row, col, char, delta):
+        p = _player_index(char)
+        mine, theirs = self._line_counts[p], self._line_counts[1 - p]
+        my_open, their_open = self._open_lines[p], self._open_lines[1 - p]
+        for ix in cell_lines(self.rows, self.columns, self.win_count)[row][col]:
+            m, t = mine[ix], theirs[ix]
+            if t == 0:
+                my_open[m] -= 1
+                my_open[m + delta] += 1
+            if m == 0:
+                their_open[t] -= 1
+            if m + delta == 0:
+                their_open[t] += 1
+            mine[ix] = m + delta
 
     def find_winner(self):
         """
         Given the current state of the board, find out if there is a winner.
         :return: Character that won, either X or O. None if no winner found.
         """
-        if self._is_winner(PlayerCharacter.player1):
+        if self.has_win(PlayerCharacter.player1):
             return PlayerCharacter.player1
-        if self._is_winner(PlayerCharacter.player2):
+        if self.has_win(PlayerCharacter.player2):
             return PlayerCharacter.player2
         return None
 
-    def _is_winner(self, character):
-        count = 0
-        # Horizontal check
-        for row in self.board:
-            for el in row:
-                count = count + 1 if el == character else 0
-                if count >= WIN_COUNT:
-                    return True
-            count = 0
-
-        # Vertical check
-        for col_ix in range(self.columns):
-            for row_ix in range(self.rows):
-                count = count + 1 if self.board[row_ix][col_ix] == character else 0
-                if count >= WIN_COUNT:
-                    return True
-            count = 0
-
-        # First Diagonal check (\)
-        for row_ix in range(self.rows-WIN_COUNT+1):
-            for col_ix in range(self.columns-WIN_COUNT+1):
-                i, j = row_ix, col_ix
-                count = 0
-                while self.board[i][j] == character:
-                    count += 1
-                    if count >= WIN_COUNT:
-                        return True
-                    i, j = i + 1, j + 1
-
-        # Second Diagonal check (/)
-        for row_ix in range(self.rows-WIN_COUNT+1):
-            for col_ix in range(WIN_COUNT-1, self.columns):
-                i, j = row_ix, col_ix
-                count = 0
-                while self.board[i][j] == character:
-                    count += 1
-                    if count >= WIN_COUNT:
-                        return True
-                    i, j = i + 1, j - 1
-
-        return False
-
     def is_it_full(self):
         """
         :return: True if no more moves are allowed in this board. False otherwise.
@@ -162,6 +383,46 @@ class Board:
         return json.dumps(self, default=lambda o: o.to_dict(), indent=2)
 
 
+@lru_cache(maxsize=None)
+def clear_board_json():
+    """
+    Default of Game.board: JSON of a clear board of the standard geometry. Built on first use rather than at import
+    time, then reused.
+    """
+    return str(Board.clear_board())
+
+
+class GameQuerySet(models.QuerySet):
+    """
+    Operational queries over games. Each one is shaped to hit one of the indexes declared in Game.Meta.
+    """
+    def waiting_rooms(self):
+        """
+        :return: Rooms waiting for a player, most recently active first.
+        """
+        return self.filter(state=GameState.waiting_room).order_by('-updated_at')
+
+    def active(self):
+        """
+        :return: Games that have not finished yet, either waiting for a player or in progress.
+        """
+        return self.filter(state__in=[GameState.waiting_room, GameState.started])
+
+    def stale(self, older_than):
+        """
+        :param older_than: timedelta of inactivity after which an unfinished game is considered stale.
+        :return: Unfinished games that have not been updated within the given period.
+        """
+        return self.active().filter(updated_at__lt=timezone.now() - older_than)
+
+    def for_player(self, player):
+        """
+        :param player: player, represented by a session id.
+        :return: Games in which the given session is either player 1 or player 2.
+        """
+        return self.filter(models.Q(player1=player) | models.Q(player2=player))
+
+
 # Create your models here.
 class Game(models.Model):
     """
@@ -169,10 +430,38 @@ class Game(models.Model):
     """
     player1 = models.CharField(max_length=32, null=True)
     player2 = models.CharField(max_length=32, null=True)
-    board = models.TextField(default=str(Board.clear_board()))
+    board = models.TextField(default=clear_board_json)
     board_move_counter = models.IntegerField(default=0)
     winner = models.IntegerField(null=True, blank=True)
     state = models.CharField(max_length=32, default=GameState.waiting_room)
+    rows = models.PositiveSmallIntegerField(default=ROW_COUNT)
+    columns = models.PositiveSmallIntegerField(default=COLUMN_COUNT)
+    win_count = models.PositiveSmallIntegerField(default=WIN_COUNT)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = GameQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['state', 'updated_at'], name='game_state_updated_idx'),
+            models.Index(fields=['player1'], name='game_player1_idx'),
+            models.Index(fields=['player2'], name='game_player2_idx'),
+        ]
+
+    @staticmethod
+    def creation_defaults(rows=ROW_COUNT, columns=COLUMN_COUNT, win_count=WIN_COUNT):
+        """
+        Field values of a new game with the given geometry. Throw exception if the geometry is invalid.
+        :return: dict to be used as defaults when creating the game row.
+        """
+        validate_geometry(rows, columns, win_count)
+        return {
+            'rows': rows,
+            'columns': columns,
+            'win_count': win_count,
+            'board': str(Board.clear_board(rows, columns, win_count)),
+        }
 
     def get_board(self):
         """
@@ -205,6 +494,9 @@ class Game(models.Model):
         elif board.is_it_full():
             self.state = GameState.draw
 
+        if self.finished_at is None and self.state in (GameState.winner_found, GameState.draw):
+            self.finished_at = timezone.now()
+
     def is_game_empty(self):
         return self.player1 is None and self.player2 is None
 
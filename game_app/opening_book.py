@@ -0,0 +1,105 @@
+import mmap
+import os
+import struct
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+
+from game_app.models import BoardSide, transform_move
+
+MAGIC = b'C4OB'
+VERSION = 3
+# magic, version, rows, columns, win_count, search depth, record count
+HEADER = struct.Struct('<4sHBBBBQ')
+# canonical position hash, search score (heuristic unless beyond WIN_SCORE), row, side (0 for left, 1 for right) of
+# the move on the canonical position
+RECORD = struct.Struct('<QhBB')
+
+BookEntry = namedtuple('BookEntry', ['score', 'row', 'side'])
+
+
+def write_opening_book(path, rows, columns, win_count, search_depth, entries):
+    """
+    Writes an opening book file: a fixed header followed by fixed-size records sorted by position hash.
+    :param path: Destination file. Written to a temporary file first and then moved in place, so running processes
+        keep reading the previous book until they reopen it.
+    :param search_depth: Depth of the searches the entries come from.
+    :param entries: dict mapping Board.canonical_hash() to the BookEntry of the canonical position.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, rows, columns, win_count, search_depth, len(entries)))
+        for key in sorted(entries):
+            entry = entries[key]
+            score = max(-32768, min(32767, entry.score))
+            f.write(RECORD.pack(key, score, entry.row, 0 if entry.side == BoardSide.left else 1))
+    os.replace(tmp_path, path)
+
+
+class OpeningBook:
+    """
+    Read-only view of an opening book file. The file is memory-mapped, so lookups are a binary search over the
+    mapped pages without copying the book, and every worker process maps the same page cache.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.columns, self.win_count, self.search_depth, self.count = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f'{path} is not a version {VERSION} opening book.')
+        if len(self._map) != HEADER.size + self.count * RECORD.size:
+            self._map.close()
+            raise ValueError(f'{path} is truncated.')
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, board):
+        """
+        :param board: Board to look up.
+        :return: BookEntry with the score and best move for the player to move. Symmetric positions share a record,
+            whose move is translated to the orientation of the given board. None if the position is not in the book or
+            the book was built for another geometry.
+        """
+        if (board.rows, board.columns, board.win_count) != (self.rows, self.columns, self.win_count):
+            return None
+        key, symmetry = board.canonical()
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD.size
+            mid_key = struct.unpack_from('<Q', self._map, offset)[0]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                _, score, row, side = RECORD.unpack_from(self._map, offset)
+                row, side = transform_move(self.rows, row, BoardSide.left if side == 0 else BoardSide.right, symmetry)
+                return BookEntry(score, row, side)
+        return None
+
+    def close(self):
+        self._map.close()
+
+
+_book = None
+_book_lock = threading.Lock()
+
+
+def get_opening_book():
+    """
+    :return: Process-wide OpeningBook loaded from settings.OPENING_BOOK_PATH, or None if no book was generated.
+    """
+    global _book
+    if _book is None:
+        path = getattr(settings, 'OPENING_BOOK_PATH', None)
+        if not path or not os.path.exists(path):
+            return None
+        with _book_lock:
+            if _book is None:
+                _book = OpeningBook(path)
+    return _book
@@ -0,0 +1,132 @@
+import time
+from collections import namedtuple
+from game_app.exceptions import SearchAborted
+from game_app.models import PlayerCharacter, transform_move
+
+WIN_SCORE = 10000
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+
+SearchResult = namedtuple('SearchResult', ['score', 'row', 'side', 'depth'])
+
+
+def side_to_move(board):
+    """
+    :return: Character of the player whose turn it is on the given board.
+    """
+    return PlayerCharacter.player1 if board.move_count % 2 == 0 else PlayerCharacter.player2
+
+
+def opponent(char):
+    return PlayerCharacter.player2 if char == PlayerCharacter.player1 else PlayerCharacter.player1
+
+
+def evaluate(board, char):
+    """
+    Static evaluation of a position: lines that can still be completed, weighted by how many characters they hold.
+    :return: Score from the point of view of char. Positive is good for char. Always strictly between -WIN_SCORE and
+        WIN_SCORE, so that heuristic scores are never mistaken for forced wins or losses on large boards.
+    """
+    other = opponent(char)
+    score, weight = 0, 1
+    for count in range(1, board.win_count):
+        score += weight * (board.count_open(char, count) - board.count_open(other, count))
+        weight *= 4
+    return max(-WIN_SCORE + 1, min(WIN_SCORE - 1, score))
+
+
+def search(board, depth, table=None, deadline=None, rng=None, cancel=None):
+    """
+    Negamax search with alpha-beta pruning. The board is explored in place and left as it was.
+    :param board: Board to search, for the player whose turn it is.
+    :param depth: Number of moves to look ahead.
+    :param table: Optional transposition table (dict) shared between searches of related positions.
+    :param deadline: Optional time.time() after which the search is abandoned with SearchAborted.
+    :param rng: Optional random.Random. When given, the move returned is picked at random among the best scoring ones
+        instead of always the same one.
+    :param cancel: Optional event (threading.Event or a multiprocessing manager Event) whose setting abandons the
+        search with SearchAborted.
+    :return: SearchResult from the point of view of the player to move. Scores above WIN_SCORE are forced wins, below
+        -WIN_SCORE forced losses. row and side are None if the game is already over.
+    """
+    if board.find_winner() is not None or not board.legal_moves():
+        return SearchResult(0, None, None, depth)
+    score, move = _negamax(board, depth, -2 * WIN_SCORE, 2 * WIN_SCORE, {} if table is None else table, deadline,
+                           cancel, rng)
+    return SearchResult(score, move[0], move[1], depth)
+
+
+def _negamax(board, depth, alpha, beta, table, deadline, cancel, rng=None):
+    me = side_to_move(board)
+    moves = board.legal_moves()
+    if not moves:
+        return 0, None
+
+    wins = board.immediate_threats(me)
+    if wins:
+        # Win scores grow with the remaining depth so that faster wins are preferred, and stay above WIN_SCORE even at
+        # the search horizon
+        return WIN_SCORE + depth + 1, wins[0] if rng is None else rng.choice(wins)
+    if depth == 0:
+        return evaluate(board, me), None
+    # Leaves are cheap, so the clock is only read before expanding a node. Reading a manager event is a round trip to
+    # another process, so it is left to nodes with at least two plies below.
+    if deadline is not None and time.time() > deadline:
+        raise SearchAborted()
+    if cancel is not None and depth >= 2 and cancel.is_set():
+        raise SearchAborted()
+
+    # Symmetric positions share entries, whose moves are stored in the canonical orientation
+    key, symmetry = board.canonical()
+    entry = table.get(key)
+    best_move = None
+    if entry is not None:
+        entry_depth, flag, entry_score, best_move = entry
+        if best_move is not None:
+            best_move = transform_move(board.rows, best_move[0], best_move[1], symmetry)
+        if entry_depth >= depth:
+            if flag == _EXACT:
+                return entry_score, best_move
+            if flag == _LOWER:
+                alpha = max(alpha, entry_score)
+            elif flag == _UPPER:
+                beta = min(beta, entry_score)
+            if alpha >= beta:
+                return entry_score, best_move
+
+    blocks = board.immediate_threats(opponent(me))
+    if blocks:
+        # Any other move loses right away
+        moves = blocks
+    if rng is not None:
+        # Only the first of equally scored moves is kept, so a random order picks one of them at random
+        rng.shuffle(moves)
+    elif not blocks:
+        middle = board.rows - 1
+        moves.sort(key=lambda m: abs(2 * m[0] - middle))
+    if rng is None and best_move in moves:
+        moves.remove(best_move)
+        moves.insert(0, best_move)
+
+    original_alpha = alpha
+    best_score, best_move = float('-inf'), moves[0]
+    for row, side in moves:
+        col = board.move(row, side, me)
+        try:
+            score = -_negamax(board, depth - 1, -beta, -alpha, table, deadline, cancel)[0]
+        finally:
+            board.undo(row, col)
+        if score > best_score:
+            best_score, best_move = score, (row, side)
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+
+    if best_score <= original_alpha:
+        flag = _UPPER
+    elif best_score >= beta:
+        flag = _LOWER
+    else:
+        flag = _EXACT
+    table[key] = (depth, flag, best_score, transform_move(board.rows, best_move[0], best_move[1], symmetry))
+    return best_score, best_move
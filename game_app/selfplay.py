@@ -0,0 +1,128 @@
+import random
+
+from game_app.exceptions import IllegalMoveException
+from game_app.models import Board, BoardSide, PlayerCharacter, ROW_COUNT, COLUMN_COUNT, WIN_COUNT
+from game_app.search import evaluate, opponent, search
+
+
+def random_policy(board, char, rng):
+    """
+    Plays any legal move.
+    """
+    return rng.choice(board.legal_moves())
+
+
+def greedy_policy(board, char, rng):
+    """
+    Wins if it can, otherwise blocks the opponent's winning move, otherwise plays the move with the best static
+    evaluation. Ties are broken at random.
+    """
+    wins = board.immediate_threats(char)
+    if wins:
+        return rng.choice(wins)
+    blocks = board.immediate_threats(opponent(char))
+    if blocks:
+        return rng.choice(blocks)
+    best_score, best_moves = None, []
+    for row, side in board.legal_moves():
+        col = board.move(row, side, char)
+        score = evaluate(board, char)
+        board.undo(row, col)
+        if best_score is None or score > best_score:
+            best_score, best_moves = score, [(row, side)]
+        elif score == best_score:
+            best_moves.append((row, side))
+    return rng.choice(best_moves)
+
+
+def search_policy(depth):
+    """
+    :return: Policy playing the best move found by a search of the given depth. Ties between equally scored moves
+        are broken with rng, so different seeds play different games.
+    """
+    def policy(board, char, rng):
+        result = search(board, depth, rng=rng)
+        return result.row, result.side
+    return policy
+
+
+def make_policy(name):
+    """
+    :param name: 'random', 'greedy' or 'search-N', N being the search depth (at least 1).
+    :return: Policy function taking (board, char, rng) and returning a (row, side) move.
+    """
+    if name == 'random':
+        return random_policy
+    if name == 'greedy':
+        return greedy_policy
+    if name.startswith('search-') and name[len('search-'):].isdigit() and int(name[len('search-'):]) > 0:
+        return search_policy(int(name[len('search-'):]))
+    raise ValueError(f'Unknown policy {name}. Use random, greedy or search-N with N >= 1.')
+
+
+def play_game(player1, player2, seed, rows=ROW_COUNT, columns=COLUMN_COUNT, win_count=WIN_COUNT):
+    """
+    Plays a full game between two policies, directly on Board.
+    :param player1: Policy name of the player starting the game, as accepted by make_policy().
+    :param player2: Policy name of the other player.
+    :param seed: Seed of the random choices of both policies. The same seed replays the same game.
+    :return: Game record: geometry, policies, seed, moves (e.g. ['3L', '0R']), winner character (None for a draw) and
+        length.
+    """
+    rng = random.Random(seed)
+    policies = {PlayerCharacter.player1: make_policy(player1), PlayerCharacter.player2: make_policy(player2)}
+    board = Board.clear_board(rows, columns, win_count)
+    moves = []
+    char = PlayerCharacter.player1
+    winner = None
+    while not board.is_it_full():
+        row, side = policies[char](board, char, rng)
+        board.move(row, side, char)
+        moves.append(f'{row}{BoardSide(side).value}')
+        winner = board.find_winner()
+        if winner is not None:
+            break
+        char = opponent(char)
+    return {
+        'rows': rows,
+        'columns': columns,
+        'win_count': win_count,
+        'player1': player1,
+        'player2': player2,
+        'seed': seed,
+        'moves': moves,
+        'winner': winner.value if winner is not None else None,
+        'length': len(moves),
+    }
+
+
+def replay_game(record):
+    """
+    Replays a game record with the current move rules and checks that it ends the same way.
+    :param record: Record produced by play_game().
+    :return: Board at the end of the game. Throw IllegalMoveException if a move is rejected or the outcome differs
+        from the record.
+    """
+    board = Board.clear_board(record['rows'], record['columns'], record['win_count'])
+    char = PlayerCharacter.player1
+    for i, move in enumerate(record['moves']):
+        if board.find_winner() is not None:
+            raise IllegalMoveException(f'Game was already won before move {i}.')
+        board.move(int(move[:-1]), BoardSide(move[-1]), char)
+        char = opponent(char)
+    winner = board.find_winner()
+    if (winner.value if winner is not None else None) != record['winner']:
+        raise IllegalMoveException(f'Expected winner {record["winner"]}, found {winner}.')
+    if winner is None and not board.is_it_full():
+        raise IllegalMoveException('Game ended before the board was full.')
+    return board
+
+
+def play_games(args):
+    """
+    Process pool entry point: plays a batch of games.
+    :param args: (player1, player2, seeds, rows, columns, win_count).
+    :return: List of game records, in seed order.
+    """
+    player1, player2, seeds, rows, columns, win_count = args
+    return [play_game(player1, player2, seed, rows, columns, win_count) for seed in seeds]
@@ -0,0 +1,22 @@
+from django.conf import settings
+
+
+def apply_pragmas(cursor, pragmas):
+    """
+    Runs a PRAGMA statement for every entry of the given mapping.
+    :param cursor: DB-API cursor of an open SQLite connection.
+    :param pragmas: mapping of pragma name to value (e.g. {'journal_mode': 'WAL'}).
+    """
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    connection_created receiver. Applies settings.SQLITE_PRAGMAS to new SQLite connections.
+    """
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
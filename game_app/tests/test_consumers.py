@@ -0,0 +1,81 @@
+import asyncio
+import json
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+from django.test import SimpleTestCase
+from game_app.consumers import GameConsumer, parse_move
+from game_app.exceptions import IllegalMoveException
+from game_app.models import Board, BoardSide, Game, GameState, PlayerCharacter
+
+
+class ParseMoveTests(SimpleTestCase):
+
+    def test_single_digit_row(self):
+        self.assertEquals(parse_move('3L'), (3, 'L'))
+
+    def test_multi_digit_row(self):
+        self.assertEquals(parse_move('12R'), (12, 'R'))
+        self.assertEquals(parse_move('31L'), (31, 'L'))
+
+    def test_malformed_move(self):
+        for move in ('', 'L', 'xR', None):
+            with self.assertRaises(IllegalMoveException):
+                parse_move(move)
+
+
+class StreamHintTests(SimpleTestCase):
+
+    def test_search_failure_sent_as_error(self):
+        consumer = GameConsumer()
+        sent = []
+
+        async def send(text_data):
+            sent.append(json.loads(text_data))
+
+        async def stream_hints(board):
+            raise BrokenProcessPool('A process in the process pool was terminated abruptly.')
+            yield
+
+        consumer.send = send
+        with mock.patch('game_app.hints.stream_hints', stream_hints):
+            asyncio.run(consumer._stream_hint(Board.clear_board()))
+        self.assertEquals(len(sent), 1)
+        self.assertEquals(sent[0]['type'], 'error')
+        self.assertIn('terminated abruptly', sent[0]['message'])
+
+    def test_repeated_request_keeps_running_search(self):
+        consumer = GameConsumer()
+        consumer.player_count = 1
+        consumer.game = Game(state=GameState.started, board=str(Board.clear_board()), board_move_counter=0)
+        streams = []
+
+        async def refresh_game():
+            pass
+
+        async def stream_hints(board):
+            streams.append(board.move_count)
+            await asyncio.Event().wait()
+            yield
+
+        async def request_hints():
+            await consumer._start_hint()
+            first = consumer.hint_task
+            await consumer._start_hint()
+            await asyncio.sleep(0)
+            self.assertIs(consumer.hint_task, first)
+            self.assertEquals(streams, [0])
+
+            # Once the position changes, the old search is cancelled and a new one starts
+            board = consumer.game.get_board()
+            board.move(3, BoardSide.left, PlayerCharacter.player1)
+            board.move(3, BoardSide.right, PlayerCharacter.player2)
+            consumer.game.update_board(board)
+            await consumer._start_hint()
+            await asyncio.sleep(0)
+            self.assertTrue(first.cancelled())
+            self.assertEquals(streams, [0, 2])
+            consumer._cancel_hint()
+
+        consumer._refresh_game = refresh_game
+        with mock.patch('game_app.hints.stream_hints', stream_hints):
+            asyncio.run(request_hints())
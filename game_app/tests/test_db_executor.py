@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import time
+from django.test import SimpleTestCase
+from game_app.db_executor import RoomDatabaseExecutor
+
+
+class RoomDatabaseExecutorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.executor = RoomDatabaseExecutor(4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_room_operations_run_in_order(self):
+        calls = []
+        futures = [self.executor.submit(22, calls.append, i) for i in range(100)]
+        for f in futures:
+            f.result()
+        self.assertEquals(calls, list(range(100)))
+
+    def test_rooms_on_different_workers_run_in_parallel(self):
+        self.assertNotEqual(self.executor.worker_for(1), self.executor.worker_for(2))
+        blocked = threading.Event()
+        slow = self.executor.submit(1, blocked.wait, 5)
+        fast = self.executor.submit(2, lambda: 'done')
+        self.assertEquals(fast.result(timeout=1), 'done')
+        self.assertFalse(slow.done())
+        blocked.set()
+        self.assertTrue(slow.result(timeout=1))
+
+    def test_run_from_event_loop(self):
+        result = asyncio.run(self.executor.run(7, lambda a, b: a + b, 2, 3))
+        self.assertEquals(result, 5)
+
+    def test_stats(self):
+        started, blocked = threading.Event(), threading.Event()
+        self.executor.submit(3, lambda: started.set() or blocked.wait(5))
+        started.wait(1)
+        queued = self.executor.submit(3, time.sleep, 0)
+        self.assertEquals(self.executor.stats()['queue_depth'], 1)
+        time.sleep(0.05)
+        blocked.set()
+        queued.result(timeout=1)
+        stats = self.executor.stats()
+        worker = stats['per_worker'][self.executor.worker_for(3)]
+        self.assertEquals(stats['queue_depth'], 0)
+        self.assertEquals(worker['completed'], 2)
+        self.assertGreaterEqual(worker['max_wait'], 0.05)
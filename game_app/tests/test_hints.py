@@ -0,0 +1,102 @@
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.test import SimpleTestCase, override_settings
+from game_app import hints, opening_book
+from game_app.models import Board, BoardSide, PlayerCharacter, transform_move
+from game_app.search import WIN_SCORE
+
+
+@override_settings(OPENING_BOOK_PATH=None)
+class HintTests(SimpleTestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        hints._cache.clear()
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _collect(self, board, max_depth, time_budget=None):
+        async def collect():
+            return [r async for r in hints.stream_hints(board, max_depth, executor=self.executor,
+                                                        time_budget=time_budget)]
+        return asyncio.run(collect())
+
+    def test_results_deepen(self):
+        board = Board.clear_board(5, 5, 3)
+        self.assertEquals([r.depth for r in self._collect(board, 3)], [1, 2, 3])
+
+    def test_repeated_request_served_from_cache(self):
+        board = Board.clear_board(5, 5, 3)
+        first = self._collect(board, 3)
+        self.executor.shutdown()
+        # The executor can no longer run searches, so the result must come from the cache
+        self.assertEquals(self._collect(board, 3), [first[-1]])
+
+    def test_stops_at_forced_win(self):
+        board = Board.clear_board(5, 5, 3)
+        board.move(2, BoardSide.left, PlayerCharacter.player1)
+        board.move(0, BoardSide.left, PlayerCharacter.player2)
+        board.move(2, BoardSide.left, PlayerCharacter.player1)
+        board.move(4, BoardSide.left, PlayerCharacter.player2)
+        results = self._collect(board, 5)
+        self.assertEquals(len(results), 1)
+        self.assertGreater(results[0].score, WIN_SCORE)
+        self.assertEquals((results[0].row, results[0].side), (2, BoardSide.left))
+
+    def test_no_hint_for_finished_game(self):
+        board = Board([['X', 'O'], ['O', 'X']], 4)
+        self.assertEquals(self._collect(board, 3), [])
+
+    def test_stops_at_time_budget(self):
+        board = Board.clear_board()
+        start = time.time()
+        results = self._collect(board, 20, time_budget=0.2)
+        self.assertLess(time.time() - start, 2)
+        self.assertLess(len(results), 20)
+        self.assertEquals([r.depth for r in results], list(range(1, len(results) + 1)))
+
+    def test_max_depth_shrinks_with_rows(self):
+        self.assertEquals(hints.max_hint_depth(Board.clear_board()), 8)
+        self.assertEquals(hints.max_hint_depth(Board.clear_board(5, 5, 3)), 8)
+        self.assertEquals(hints.max_hint_depth(Board.clear_board(14, 14, 5)), 4)
+        self.assertEquals(hints.max_hint_depth(Board.clear_board(32, 32, 12)), 2)
+
+    def test_deepens_past_opening_book(self):
+        board = Board.clear_board(5, 5, 3)
+        key, symmetry = board.canonical()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'book.bin')
+            opening_book.write_opening_book(path, 5, 5, 3, 2, {
+                key: opening_book.BookEntry(7, *transform_move(5, 1, BoardSide.right, symmetry))
+            })
+            with override_settings(OPENING_BOOK_PATH=path):
+                opening_book._book = None
+                try:
+                    results = self._collect(board, 4)
+                finally:
+                    opening_book._book.close()
+                    opening_book._book = None
+        self.assertEquals(results[0], (7, 1, BoardSide.right, 2))
+        self.assertEquals([r.depth for r in results], [2, 3, 4])
+
+    def test_cancel_frees_worker(self):
+        board = Board.clear_board()
+
+        async def cancel_running_search():
+            task = asyncio.ensure_future(self._consume(board))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            start = time.time()
+            # The only worker runs this as soon as the cancelled search gives it up
+            await asyncio.get_running_loop().run_in_executor(self.executor, time.time)
+            return time.time() - start
+
+        self.assertLess(asyncio.run(cancel_running_search()), 1)
+
+    async def _consume(self, board):
+        async for _ in hints.stream_hints(board, 20, executor=self.executor, time_budget=60):
+            pass
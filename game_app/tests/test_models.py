@@ -1,6 +1,10 @@
+import random
+from datetime import timedelta
 from django.test import TestCase
-from game_app.models import Board, PlayerCharacter, BoardSide
-from game_app.exceptions import IllegalMoveException
+from django.utils import timezone
+from game_app.models import Board, Game, GameState, PlayerCharacter, BoardSide, SYMMETRIES, transform_move, \
+    winning_lines, winning_segments
+from game_app.exceptions import IllegalMoveException, InvalidBoardGeometry
 
 
 class BoardTests(TestCase):
@@ -209,6 +213,136 @@ class BoardTests(TestCase):
         with self.assertRaises(IllegalMoveException):
             b.move(10, BoardSide.left, PlayerCharacter.player1)
 
+    def test_legacy_board_json_uses_default_win_count(self):
+        b = Board.from_json('{"board": [["_", "_"], ["_", "_"]], "move_count": 0}')
+        self.assertEquals(b.win_count, 4)
 
+    def test_winner_custom_win_count(self):
+        b = Board.clear_board(5, 9, 5)
+        for _ in range(4):
+            b.move(2, BoardSide.right, PlayerCharacter.player2)
+        self.assertIsNone(b.find_winner())
+        b.move(2, BoardSide.right, PlayerCharacter.player2)
+        self.assertEquals(b.find_winner(), PlayerCharacter.player2)
+        self.assertEquals(Board.from_json(str(b)).win_count, 5)
+
+    def test_winner_diagonal_non_square(self):
+        b = Board.clear_board(4, 9, 3)
+        for row, col in [(1, 8), (2, 7), (3, 6)]:
+            b.board[row][col] = PlayerCharacter.player1
+        self.assertEquals(b.find_winner(), PlayerCharacter.player1)
+
+    def test_winning_segments(self):
+        # 3 rows, 4 columns and 2 diagonals in each direction are long enough to hold 3 in a row
+        self.assertEquals(len(winning_segments(3, 4, 3)), 3 + 4 + 2 + 2)
+        self.assertIs(winning_segments(3, 4, 3), winning_segments(3, 4, 3))
+
+    def test_legal_moves(self):
+        b = Board([['X', '_', 'O'], ['_', '_', '_'], ['O', 'X', 'O']], 5)
+        self.assertEquals(b.legal_moves(), [(0, BoardSide.left), (1, BoardSide.left), (1, BoardSide.right)])
+
+    def test_immediate_threats(self):
+        b = Board.clear_board()
+        for _ in range(3):
+            b.move(4, BoardSide.left, PlayerCharacter.player1)
+        self.assertEquals(b.immediate_threats(PlayerCharacter.player1), [(4, BoardSide.left)])
+        self.assertEquals(b.immediate_threats(PlayerCharacter.player2), [])
+        self.assertEquals(b.count_open(PlayerCharacter.player1, 3), 1)
+        b.move(4, BoardSide.left, PlayerCharacter.player2)
+        self.assertEquals(b.immediate_threats(PlayerCharacter.player1), [])
+        self.assertEquals(b.count_open(PlayerCharacter.player1, 3), 0)
+
+    def test_line_counters_match_full_scan(self):
+        rng = random.Random(7)
+        for rows, columns, win_count in [(7, 7, 4), (6, 9, 5), (4, 4, 3)]:
+            for _ in range(20):
+                b = Board.clear_board(rows, columns, win_count)
+                b.find_winner()
+                chars = [PlayerCharacter.player1, PlayerCharacter.player2]
+                while b.legal_moves() and b.find_winner() is None:
+                    row, side = rng.choice(b.legal_moves())
+                    b.move(row, side, chars[b.move_count % 2])
+                    fresh = Board.from_json(str(b))
+                    for char in chars:
+                        other = chars[1 - chars.index(char)]
+                        for n in range(win_count + 1):
+                            expected = sum(1 for line in winning_lines(rows, columns, win_count)
+                                           if sum(b.board[r][c] == char for r, c in line) == n
+                                           and not any(b.board[r][c] == other for r, c in line))
+                            self.assertEquals(b.count_open(char, n), expected)
+                            self.assertEquals(fresh.count_open(char, n), expected)
+                    self.assertEquals(b.find_winner(), fresh.find_winner())
+
+    def test_undo_restores_counters_and_hash(self):
+        b = Board.clear_board()
+        b.move(3, BoardSide.left, PlayerCharacter.player1)
+        before = (b.position_hash(), b.count_open(PlayerCharacter.player1, 1), b.move_count)
+        col = b.move(3, BoardSide.left, PlayerCharacter.player2)
+        self.assertNotEqual(b.position_hash(), before[0])
+        b.undo(3, col)
+        self.assertEquals((b.position_hash(), b.count_open(PlayerCharacter.player1, 1), b.move_count), before)
+        self.assertEquals(b.position_hash(), Board.from_json(str(b)).position_hash())
+
+    def test_canonical_hash_of_symmetric_positions(self):
+        moves = [(1, BoardSide.left), (1, BoardSide.left), (5, BoardSide.right), (0, BoardSide.left)]
+        chars = [PlayerCharacter.player1, PlayerCharacter.player2]
+        boards = [Board.clear_board(7, 6, 4) for _ in SYMMETRIES]
+        for i, (row, side) in enumerate(moves):
+            for symmetry, b in enumerate(boards):
+                b.move(*transform_move(7, row, side, symmetry), chars[i % 2])
+        hashes = {b.position_hash() for b in boards}
+        self.assertEquals(len(hashes), 4)
+        self.assertEquals({b.canonical_hash() for b in boards}, {min(hashes)})
+        for i, b in enumerate(boards):
+            # Symmetry indexes combine by xor, mirroring being bit 0 and flipping bit 1
+            key, symmetry = b.canonical()
+            self.assertEquals(key, boards[i ^ symmetry].position_hash())
+        self.assertEquals(boards[1].board[1], ['_', '_', '_', '_', 'X', 'O'])
+
+
+class GameGeometryTests(TestCase):
+
+    def test_create_with_geometry(self):
+        game = Game.objects.create(**Game.creation_defaults(9, 11, 5))
+        board = Game.objects.get(pk=game.pk).get_board()
+        self.assertEquals((board.rows, board.columns, board.win_count), (9, 11, 5))
+        self.assertEquals((game.rows, game.columns, game.win_count), (9, 11, 5))
+
+    def test_invalid_geometry(self):
+        with self.assertRaises(InvalidBoardGeometry):
+            Game.creation_defaults(0, 7, 4)
+        with self.assertRaises(InvalidBoardGeometry):
+            Game.creation_defaults(7, 100, 4)
+        with self.assertRaises(InvalidBoardGeometry):
+            Game.creation_defaults(3, 3, 4)
+
+
+class GameQueryTests(TestCase):
+
+    def test_waiting_rooms(self):
+        waiting = Game.objects.create()
+        Game.objects.create(player1='a', player2='b', state=GameState.started)
+        self.assertEquals(list(Game.objects.waiting_rooms()), [waiting])
+
+    def test_stale(self):
+        old = Game.objects.create(player1='a')
+        recent = Game.objects.create(player1='b')
+        finished = Game.objects.create(player1='c', state=GameState.draw)
+        Game.objects.filter(pk__in=[old.pk, finished.pk]).update(updated_at=timezone.now() - timedelta(days=1))
+        stale = list(Game.objects.stale(timedelta(hours=1)))
+        self.assertEquals(stale, [old])
+        self.assertNotIn(recent, stale)
 
+    def test_for_player(self):
+        g1 = Game.objects.create(player1='a', player2='b')
+        g2 = Game.objects.create(player1='c', player2='a')
+        Game.objects.create(player1='c', player2='d')
+        self.assertEquals(set(Game.objects.for_player('a')), {g1, g2})
 
+    def test_finished_at_set_on_draw(self):
+        game = Game.objects.create(player1='a', player2='b', state=GameState.started)
+        board = Board([['X', 'O'], ['O', 'X']], 4)
+        self.assertIsNone(game.finished_at)
+        game.update_board(board)
+        self.assertEquals(game.state, GameState.draw)
+        self.assertIsNotNone(game.finished_at)
@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+from django.core.management import call_command, CommandError
+from django.test import SimpleTestCase
+from game_app.models import Board, BoardSide, PlayerCharacter, transform_move
+from game_app.opening_book import BookEntry, OpeningBook, write_opening_book
+from game_app.search import search
+
+
+class OpeningBookTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'book.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_lookup(self):
+        boards = [Board.clear_board(5, 5, 3) for _ in range(3)]
+        boards[1].move(2, BoardSide.left, PlayerCharacter.player1)
+        boards[2].move(4, BoardSide.right, PlayerCharacter.player1)
+        entries = {}
+        for i, b in enumerate(boards):
+            key, symmetry = b.canonical()
+            entries[key] = BookEntry(i * 10, *transform_move(5, i, BoardSide.right, symmetry))
+        write_opening_book(self.path, 5, 5, 3, 4, entries)
+
+        book = OpeningBook(self.path)
+        self.assertEquals(len(book), 3)
+        self.assertEquals(book.search_depth, 4)
+        for i, b in enumerate(boards):
+            self.assertEquals(book.lookup(b), BookEntry(i * 10, i, BoardSide.right))
+        boards[0].move(1, BoardSide.left, PlayerCharacter.player1)
+        self.assertIsNone(book.lookup(boards[0]))
+        self.assertIsNone(book.lookup(Board.clear_board(5, 6, 3)))
+        book.close()
+
+    def test_lookup_symmetric_position(self):
+        board = Board.clear_board(5, 5, 3)
+        board.move(1, BoardSide.left, PlayerCharacter.player1)
+        key, symmetry = board.canonical()
+        write_opening_book(self.path, 5, 5, 3, 4, {key: BookEntry(5, *transform_move(5, 0, BoardSide.left, symmetry))})
+
+        book = OpeningBook(self.path)
+        mirrored = Board.clear_board(5, 5, 3)
+        mirrored.move(1, BoardSide.right, PlayerCharacter.player1)
+        flipped = Board.clear_board(5, 5, 3)
+        flipped.move(3, BoardSide.left, PlayerCharacter.player1)
+        self.assertEquals(book.lookup(board), BookEntry(5, 0, BoardSide.left))
+        self.assertEquals(book.lookup(mirrored), BookEntry(5, 0, BoardSide.right))
+        self.assertEquals(book.lookup(flipped), BookEntry(5, 4, BoardSide.left))
+        book.close()
+
+    def test_build_command(self):
+        call_command('build_opening_book', depth=2, search_depth=2, rows=4, columns=4, win=3, workers=1,
+                     output=self.path, stdout=io.StringIO())
+        book = OpeningBook(self.path)
+        self.assertEquals(book.search_depth, 2)
+        board = Board.clear_board(4, 4, 3)
+        board.move(1, BoardSide.left, PlayerCharacter.player1)
+        entry = book.lookup(board)
+        expected = search(board, 2)
+        self.assertEquals(entry, BookEntry(expected.score, expected.row, expected.side))
+        book.close()
+
+    def test_build_command_rejects_zero_search_depth(self):
+        with self.assertRaises(CommandError):
+            call_command('build_opening_book', depth=1, search_depth=0, rows=4, columns=4, win=3, workers=1,
+                         output=self.path, stdout=io.StringIO())
@@ -0,0 +1,52 @@
+import random
+import threading
+import time
+from django.test import SimpleTestCase
+from game_app.exceptions import SearchAborted
+from game_app.models import Board, BoardSide, PlayerCharacter
+from game_app.search import WIN_SCORE, evaluate, search, side_to_move
+
+
+class SearchTests(SimpleTestCase):
+
+    def _random_board(self, rows, columns, win_count, moves, seed):
+        board = Board.clear_board(rows, columns, win_count)
+        rng = random.Random(seed)
+        for _ in range(moves):
+            board.move(*rng.choice(board.legal_moves()), side_to_move(board))
+        return board
+
+    def test_evaluation_stays_below_win_score(self):
+        board = self._random_board(32, 32, 12, 449, 0)
+        self.assertLess(abs(evaluate(board, side_to_move(board))), WIN_SCORE)
+
+    def test_search_large_board(self):
+        # Every reply scores far below -WIN_SCORE without clamping, which used to leave no best move
+        board = self._random_board(32, 32, 12, 449, 0)
+        result = search(board, 1)
+        self.assertIn((result.row, result.side), board.legal_moves())
+        self.assertLess(abs(result.score), WIN_SCORE)
+
+    def test_deadline_abandons_search(self):
+        board = self._random_board(7, 7, 4, 6, 0)
+        before = str(board), board.position_hash(), board.count_open(side_to_move(board), 2)
+        with self.assertRaises(SearchAborted):
+            search(board, 20, deadline=time.time() + 0.05)
+        self.assertEquals((str(board), board.position_hash(), board.count_open(side_to_move(board), 2)), before)
+
+    def test_forced_loss_at_horizon(self):
+        # O threatens both ends of its column, so X loses whatever it plays
+        board = Board.clear_board(5, 5, 3)
+        board.move(2, BoardSide.left, PlayerCharacter.player1)
+        board.move(2, BoardSide.left, PlayerCharacter.player2)
+        board.move(1, BoardSide.left, PlayerCharacter.player1)
+        self.assertLess(search(board, 1).score, -WIN_SCORE)
+        self.assertLess(search(board, 2).score, -WIN_SCORE)
+
+    def test_cancel_abandons_search(self):
+        board = self._random_board(7, 7, 4, 6, 0)
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(SearchAborted):
+            search(board, 4, cancel=cancel)
+        self.assertEquals(search(board, 4, cancel=threading.Event()), search(board, 4))
@@ -0,0 +1,64 @@
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command, CommandError
+from django.test import SimpleTestCase
+from game_app.exceptions import IllegalMoveException
+from game_app.selfplay import make_policy, play_game, replay_game
+
+
+class SelfPlayTests(SimpleTestCase):
+
+    def test_same_seed_same_game(self):
+        self.assertEquals(play_game('random', 'greedy', 3), play_game('random', 'greedy', 3))
+        self.assertNotEqual(play_game('random', 'random', 3)['moves'], play_game('random', 'random', 4)['moves'])
+
+    def test_search_games_vary_with_seed(self):
+        games = [play_game('search-2', 'search-2', seed, rows=5, columns=5, win_count=4)['moves'] for seed in range(5)]
+        self.assertGreater(len(set(map(tuple, games))), 1)
+        self.assertEquals(play_game('search-2', 'search-2', 3, rows=5, columns=5, win_count=4)['moves'], games[3])
+
+    def test_replay_matches_record(self):
+        for policy in ['random', 'greedy', 'search-1']:
+            record = play_game(policy, 'random', 11, rows=6, columns=5, win_count=4)
+            board = replay_game(record)
+            self.assertEquals(board.move_count, record['length'])
+
+    def test_replay_detects_wrong_outcome(self):
+        record = play_game('greedy', 'random', 5)
+        record['winner'] = 'X' if record['winner'] == 'O' else 'O'
+        with self.assertRaises(IllegalMoveException):
+            replay_game(record)
+
+    def test_unknown_policy(self):
+        for name in ['search-', 'search-0', 'minimax']:
+            with self.assertRaises(ValueError):
+                make_policy(name)
+        with self.assertRaises(CommandError):
+            call_command('selfplay', games=1, player1='search-0', workers=1, stdout=io.StringIO())
+
+    def test_verify_reports_malformed_records(self):
+        record = json.dumps(play_game('random', 'random', 1))
+        bad_side = json.loads(record)
+        bad_side['moves'][0] = bad_side['moves'][0][:-1] + 'Z'
+        missing = json.loads(record)
+        del missing['moves']
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.jsonl')
+            for bad in ['{"moves": [', json.dumps(bad_side), json.dumps(missing)]:
+                with open(path, 'w') as f:
+                    f.write(record + '\n' + bad + '\n')
+                with self.assertRaisesRegex(CommandError, f'{path}:2: '):
+                    call_command('selfplay', verify=path, stdout=io.StringIO())
+
+    def test_command_writes_and_verifies_corpus(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.jsonl')
+            call_command('selfplay', games=25, workers=1, batch_size=10, output=path, stdout=io.StringIO())
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+            self.assertEquals([r['seed'] for r in records], list(range(25)))
+            out = io.StringIO()
+            call_command('selfplay', verify=path, stdout=out)
+            self.assertIn('25 games replayed', out.getvalue())
@@ -0,0 +1,24 @@
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from game_app.sqlite import configure_connection
+
+
+class SqlitePragmaTests(TransactionTestCase):
+
+    @override_settings(SQLITE_PRAGMAS={'synchronous': 'NORMAL', 'busy_timeout': 1234})
+    def test_pragmas_applied_to_connection(self):
+        configure_connection(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEquals(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEquals(cursor.fetchone()[0], 1234)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_no_pragmas_by_default(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            before = cursor.fetchone()[0]
+            configure_connection(sender=None, connection=connection)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEquals(cursor.fetchone()[0], before)